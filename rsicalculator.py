@@ -1,13 +1,16 @@
 # Import required libraries
 
 import requests                     # For making HTTP requests to APIs
-import pandas as pd                 # For data manipulation and handling of CSVs
+import orjson                       # For fast parsing of JSON responses
 import numpy as np                  # For numerical operations
-from datetime import datetime       # For timestamp creation
-import time                         # For adding delays between API calls
+import time                         # For scheduling API calls and timestamp creation
+import asyncio                      # For running several trackers concurrently
 import logging                      # For logging information and potential errors
-from typing import List, Dict       # For type hints
+from typing import List, Dict, Optional # For type hints
 import random                       # For generating random numbers
+import csv                          # For appending rows to the CSV log
+import atexit                       # For closing the CSV file on shutdown
+import os                           # For checking whether the CSV file exists
 import string                       # For generating random strings
 
 # This will configure logging and show timestamp, level, and message
@@ -30,8 +33,14 @@ class CryptoRSITracker:
         self.symbol = symbol             # The trading pair that is being tracked
         self.period = period             # The period for RSI calculations
         self.api_delay = api_delay       # Time between API calls   
-        self.prices: List[float] = []    # An empty list where historical prices are stored   
+        self._warmup = np.empty(period + 1, dtype=np.float64)  # Prices collected until the first RSI can be seeded
+        self._warmup_count = 0           # Number of prices written into the warmup buffer
+        self._avg_gain: Optional[float] = None  # Wilder-smoothed average gain
+        self._avg_loss: Optional[float] = None  # Wilder-smoothed average loss
+        self._last_price: Optional[float] = None  # Previous price, used for the next price change
+        self._last_rsi: Optional[float] = None    # Most recent RSI value
         self.csv_filename = f'{symbol.replace("/", "_")}_rsi_log.csv' # Create a filename for CSV and replacing / with _ symbol
+        self._log_flush_every = 10       # Number of rows buffered before flushing the CSV to disk
         
         # Generate a random 32 character ID for API requests
         self.client_id = ''.join(random.choices(string.ascii_letters + string.digits, k=32))
@@ -40,140 +49,222 @@ class CryptoRSITracker:
         self.headers = {
             'User-Agent': f'crypto-rsi-tracker-{self.client_id}',       # Identify the script being used
             'Accept': 'application/json',                               # Request JSON
+            'Accept-Encoding': 'identity',                              # Tiny payloads, skip gzip decompression
             'X-MBX-APIKEY': None                                        # Placeholder for API key
         }
         
-        # Create CSV file if it doesn't exist
-        try:
-            pd.read_csv(self.csv_filename)                  # Trying to read existing file
-        except FileNotFoundError:
-            # Create new file with headers if it doesn't exist
-            pd.DataFrame(columns=['timestamp', 'price', 'rsi']).to_csv(
-                self.csv_filename, index=False
-            )
+        # Build the API URLs once since the symbol never changes
+        api_symbol = self.symbol.replace('/', '').upper()   # Removes / and converts symbol to uppercase for API (BTC/USDT -> BTCUSDT)
+        self._binance_url = f'https://api.binance.us/api/v3/ticker/price?symbol={api_symbol}'
+        # Converting symbol to CoinGecko format (BTC/USDT -> bitcoin)
+        self._coin_id = 'bitcoin' if 'BTC' in api_symbol else api_symbol.lower().split('usdt')[0]
+        self._coingecko_url = f'https://api.coingecko.com/api/v3/simple/price?ids={self._coin_id}&vs_currencies=usd'
+        self._coingecko_etag: Optional[str] = None      # ETag of the last CoinGecko response
+        self._coingecko_price: Optional[float] = None   # Price from the last CoinGecko response
+        
+        # Reuse one session so the TCP/TLS connection is kept alive between ticks
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)                       # Headers are sent with every request
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=2))
+        
+        # Create CSV file with headers if it doesn't exist or is empty
+        if not os.path.exists(self.csv_filename) or os.path.getsize(self.csv_filename) == 0:
+            with open(self.csv_filename, 'w', newline='') as f:
+                csv.writer(f).writerow(['timestamp', 'price', 'rsi'])
+        
+        # Keep the CSV open for the lifetime of the tracker instead of reopening it every tick
+        self._csv_fp = open(self.csv_filename, 'a', newline='', buffering=65536)
+        self._csv_writer = csv.writer(self._csv_fp)
+        self._rows_since_flush = 0       # Rows written since the last flush
+        
+        # Flush and close the CSV when the program exits
+        atexit.register(self.close)
             
     def fetch_price(self) -> float:                 
         """Fetch current price from Binance API"""
         try:
-            symbol = self.symbol.replace('/', '').upper()       # Removes / and converts symbol to uppercase for API (BTC/USDT -> BTCUSDT)
-            
             # First attempt: Binance.US API
             try:
-                # Constructing Binance.US API URL
-                url = f'https://api.binance.us/api/v3/ticker/price?symbol={symbol}'
-                # Make GET request with headers and a 10 second timeout
-                response = requests.get(url, headers=self.headers, timeout=10)
+                # Make GET request on the pooled session with a 10 second timeout
+                response = self.session.get(self._binance_url, timeout=10)
                 # Check for HTTP errors
                 response.raise_for_status()
-                # Extract and return the price as float
-                return float(response.json()['price'])
+                # Extract and return the price as float (Binance sends it as a string)
+                return float(orjson.loads(response.content)['price'])
             except requests.exceptions.RequestException:
                 # If Binance.US fails, try alternative API (CoinGecko)
-                # Converting symbol to CoinGecko format (BTC/USDT -> bitcoin)
-                coin_id = 'bitcoin' if 'BTC' in symbol else symbol.lower().split('usdt')[0]
-                # Construct CoinGecko API URL
-                url = f'https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd'
-                # Make GET request
-                response = requests.get(url, headers=self.headers, timeout=10)
+                # Make a conditional GET so an unchanged price comes back as an empty 304
+                headers = {'If-None-Match': self._coingecko_etag} if self._coingecko_etag else None
+                response = self.session.get(self._coingecko_url, headers=headers, timeout=10)
                 response.raise_for_status()
-                # Extract and return price
-                return float(response.json()[coin_id]['usd'])
+                # Not modified: reuse the price from the last response
+                if response.status_code == 304:
+                    return self._coingecko_price
+                # Extract price and remember it with its ETag
+                price = float(orjson.loads(response.content)[self._coin_id]['usd'])
+                self._coingecko_etag = response.headers.get('ETag')
+                self._coingecko_price = price
+                return price
                 
         except requests.exceptions.RequestException as e:
             # Log and reraise network/API errors
-            logging.error(f'Error fetching price: {str(e)}')
+            logging.error('Error fetching price: %s', e)
             raise
         except (KeyError, ValueError) as e:
             # Log and reraise data parsing errors
-            logging.error(f'Error parsing API response: {str(e)}')
+            logging.error('Error parsing API response: %s', e)
             raise
         except Exception as e:
             # Log and reraise any other errors
-            logging.error(f'Unexpected error: {str(e)}')
+            logging.error('Unexpected error: %s', e)
             raise
 
-    def calculate_rsi(self, prices: List[float]) -> float:
-        # Check for enough data points
-        if len(prices) < self.period + 1:
-            return None
+    def update_rsi(self, price: float) -> Optional[float]:
+        """Update Wilder's smoothed averages with a new price and return the RSI"""
+        if self._avg_gain is None:
+            # Collect period + 1 prices before the first RSI is available
+            self._warmup[self._warmup_count] = price
+            self._warmup_count += 1
+            self._last_price = price
+            if self._warmup_count < self.period + 1:
+                return None
+                
+            # Sum gains and losses over the first window in a single pass
+            window = self._warmup.tolist()      # Plain floats are faster than numpy scalars in a loop
+            total_gain = 0.0
+            total_loss = 0.0
+            for i in range(1, len(window)):
+                delta = window[i] - window[i - 1]
+                if delta > 0:
+                    total_gain += delta
+                else:
+                    total_loss -= delta
             
-        # Calculate price changes between periods
-        deltas = np.diff(prices)
-        
-        # Separate gains and losses (creating an array of positive and negative changes)
-        gains = np.where(deltas > 0, deltas, 0) # If change is positive, keep it; else 0
-        losses = np.where(deltas < 0, -deltas, 0) # If change is negative, make positive; else 0
-        
-        # Calculate average gains and losses over the period
-        avg_gain = np.mean(gains[-self.period:])     # Average of latest period's gain
-        avg_loss = np.mean(losses[-self.period:])    # Average of latest period's losses
+            # Seed the averages with the simple mean of the first period's gains and losses
+            self._avg_gain = total_gain / self.period
+            self._avg_loss = total_loss / self.period
+        else:
+            # Price change since the previous tick, split into gain and loss
+            delta = price - self._last_price
+            self._last_price = price
+            
+            # No change: both averages decay by the same factor, so RSI stays the same
+            if delta == 0.0:
+                self._avg_gain = self._avg_gain * (self.period - 1) / self.period
+                self._avg_loss = self._avg_loss * (self.period - 1) / self.period
+                return self._last_rsi
+            
+            gain = max(delta, 0.0)
+            loss = max(-delta, 0.0)
+            
+            # Wilder smoothing: avg = (avg * (n - 1) + value) / n
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            
+            # No losses so far and the price went up: average loss stays 0
+            if self._avg_loss == 0.0 and gain > 0:
+                self._last_rsi = 100.0
+                return self._last_rsi
+            
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
         
         # Can't divide by 0
-        if avg_loss == 0:
-            return 100.0
+        if self._avg_loss == 0:
+            self._last_rsi = 100.0
+            return self._last_rsi
             
         # Calculation of RSI 
-        rs = avg_gain / avg_loss                #Relative strength
+        rs = self._avg_gain / self._avg_loss    #Relative strength
         rsi = 100 - (100 / (1 + rs))            # RSI formula
         
-        return round(rsi, 2)                    #Return value rounded to two decimal places
+        self._last_rsi = round(rsi, 2)          # Cache value rounded to two decimal places
+        return self._last_rsi
+
+    def _flush(self) -> None:
+        """Flush buffered rows to the CSV file"""
+        try:
+            self._csv_fp.flush()
+            self._rows_since_flush = 0
+        except OSError as e:
+            # Log any errors experienced
+            logging.error('Error writing CSV: %s', e)
+
+    def close(self) -> None:
+        """Flush and close the CSV file and the HTTP session"""
+        if self._csv_fp.closed:
+            return
+        self._flush()
+        self._csv_fp.close()
+        self.session.close()
 
     def log_data(self, timestamp: str, price: float, rsi: float) -> None:
         """Log data to CSV file"""
         try:
-            # Create a single-row DataFrame with current data
-            df = pd.DataFrame([[timestamp, price, rsi]], 
-                            columns=['timestamp', 'price', 'rsi'])
-            # Append to CSV without headers
-            df.to_csv(self.csv_filename, mode='a', header=False, index=False)
+            # Write the row and flush to disk once enough rows have accumulated
+            self._csv_writer.writerow((timestamp, price, rsi))
+            self._rows_since_flush += 1
+            if self._rows_since_flush >= self._log_flush_every:
+                self._flush()
             # Log into console
-            logging.info(f'Logged data - Time: {timestamp}, Price: {price}, RSI: {rsi}')
-        except Exception as e:
+            logging.info('Logged data - Time: %s, Price: %s, RSI: %s', timestamp, price, rsi)
+        except (OSError, csv.Error) as e:
             # Log any errors experienced
-            logging.error(f'Error logging data: {str(e)}')
+            logging.error('Error logging data: %s', e)
 
-    def run(self) -> None:
+    async def run(self) -> None:
         # Log start of tracking
         """Main loop to fetch prices, calculate RSI, and log data"""
-        logging.info(f'Starting RSI tracking for {self.symbol}')
+        logging.info('Starting RSI tracking for %s', self.symbol)
         
-        while True:
-            try:
-                # Fetch current price
-                current_price = self.fetch_price()
-                self.prices.append(current_price)
+        try:
+            while True:
+                try:
+                    # Schedule the next tick now so fetch and logging time is absorbed into the delay
+                    # Add jitter to API delay to prevent exact timing patterns (random delay variation)
+                    next_tick = time.monotonic() + self.api_delay + random.uniform(-2, 2)
+                    
+                    # Fetch current price in a worker thread so other trackers keep running
+                    current_price = await asyncio.to_thread(self.fetch_price)
                 
-                # Calculate RSI if enough data points
-                rsi = self.calculate_rsi(self.prices)
+                    # Update RSI with the new price (None until enough data points)
+                    rsi = self.update_rsi(current_price)
                 
-                # Get current timestamp
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    # Get current timestamp
+                    t = time.localtime()
+                    timestamp = f'{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}'
                 
-                # Log data if RSI is available
-                if rsi is not None:
-                    self.log_data(timestamp, current_price, rsi)
+                    # Log data if RSI is available
+                    if rsi is not None:
+                        self.log_data(timestamp, current_price, rsi)
                 
-                # Keep only the recent prices (2 * period length)
-                if len(self.prices) > self.period * 2:
-                    self.prices = self.prices[-(self.period * 2):]
+                    # Sleep only for what is left until the next tick
+                    await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
                 
-                # Add jitter to API delay to prevent exact timing patterns (random delay variation)
-                jitter = random.uniform(-2, 2)
-                time.sleep(self.api_delay + jitter)
+                except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                    # Log network and API response errors, anything else is a bug and is re-raised
+                    logging.error('Error in main loop: %s', e)
+                    # Get logged rows onto disk while backing off
+                    self._flush()
+                    # Exponential backoff on error (wait 5 minutes)
+                    await asyncio.sleep(min(self.api_delay * 2, 300))  
                 
-            except Exception as e:
-                # Log any errors
-                logging.error(f'Error in main loop: {str(e)}')
-                # Exponential backoff on error (wait 5 minutes)
-                time.sleep(min(self.api_delay * 2, 300))  
+        finally:
+            # Ctrl+C cancels this task; close the CSV cleanly before exiting
+            self.close()
                 
                 #Script
 
+async def main(symbols: List[str]) -> None:
+    # Create one tracker per trading pair and run them all on a single event loop
+    trackers = [
+        CryptoRSITracker(
+            symbol=symbol,      # Trading pair
+            period=14,          # RSI period
+            api_delay=60        # Delay between API calls in seconds
+        )
+        for symbol in symbols
+    ]
+    await asyncio.gather(*(tracker.run() for tracker in trackers))
+
 if __name__ == '__main__':
-    # Create and run tracker
-    tracker = CryptoRSITracker(
-        symbol='BTC/USDT',  # Trading pair
-        period=14,          # RSI period
-        api_delay=60        # Delay between API calls in seconds
-    )
-    tracker.run()
\ No newline at end of file
+    # Add more trading pairs to track them concurrently
+    asyncio.run(main(['BTC/USDT']))
\ No newline at end of file